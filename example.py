@@ -4,7 +4,7 @@ Example script demonstrating how to use the Google Imagen 4 API directly.
 """
 
 import os
-from google import genai
+from imagen4_cli import setup_client
 
 # Get project ID from environment variable
 project_id = os.environ.get("GOOGLE_CLOUD_PROJECT")
@@ -12,7 +12,7 @@ if not project_id:
     project_id = input("Enter your Google Cloud project ID: ")
 
 # Initialize the client
-client = genai.Client(vertexai=True, project=project_id, location="us-central1")
+client = setup_client(project_id=project_id, location="us-central1")
 
 # Example prompt
 prompt = """
@@ -28,8 +28,7 @@ image = client.models.generate_images(
 )
 
 # Save the image to a file
-with open("example_output.png", "wb") as f:
-    f.write(image.generated_images[0].image.data)
+image.generated_images[0].image.save("example_output.png")
 
 print("Image generated and saved as 'example_output.png'")
 
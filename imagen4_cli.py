@@ -8,19 +8,90 @@ and displays the generated images.
 import os
 import sys
 import argparse
+import asyncio
+import hashlib
+import platform
+import subprocess
+import json
+import random
+import shutil
+import time
+from functools import lru_cache
 from pathlib import Path
 import tempfile
 import webbrowser
+import httpx
 from google import genai
-from google.cloud import aiplatform
+from google.genai import errors
 
-def setup_client(project_id=None, location="us-central1"):
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+CACHE_DIR = Path.home() / ".cache" / "imagen4"
+
+# HTTP status codes the Imagen API returns for transient failures (rate limiting, overload, timeouts)
+RETRYABLE_STATUS_CODES = {429, 500, 503, 504}
+# Client-side timeouts and dropped connections from the SDK's HTTP transports (httpx, or aiohttp when installed).
+# Deterministic transport failures such as bad proxies or unsupported URLs are deliberately left out.
+RETRYABLE_TRANSPORT_ERRORS = (
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+)
+if aiohttp is not None:
+    RETRYABLE_TRANSPORT_ERRORS += (aiohttp.ServerDisconnectedError, aiohttp.ServerTimeoutError)
+MAX_RETRIES = 5
+
+# Imagen accepts prompts of up to 480 tokens. Without a local tokenizer this approximates that limit
+# at ~4 characters per token; truncating to it avoids most overlong-prompt rejections, but a
+# truncated prompt that is token-dense can still be rejected by the API.
+MAX_PROMPT_TOKENS = 480
+MAX_PROMPT_LENGTH = MAX_PROMPT_TOKENS * 4
+KNOWN_MODELS = {
+    "imagen-4.0-generate-preview-05-20",
+    "imagen-4.0-ultra-generate-preview-06-06",
+    "imagen-4.0-fast-generate-preview-06-06",
+    "imagen-4.0-generate-001",
+    "imagen-4.0-ultra-generate-001",
+    "imagen-4.0-fast-generate-001",
+    "imagen-3.0-generate-002",
+    "imagen-3.0-generate-001",
+    "imagen-3.0-fast-generate-001",
+}
+
+class _SafeFilenameTable(dict):
+    """str.translate table mapping alphanumeric characters to themselves and everything else to "_"."""
+    
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        replacement = char if char.isalnum() else "_"
+        self[codepoint] = replacement
+        return replacement
+
+_SAFE_FILENAME_TABLE = _SafeFilenameTable()
+# Prebuild the Latin-1 range; other codepoints are filled in on first use
+for _codepoint in range(256):
+    _SAFE_FILENAME_TABLE[_codepoint]
+del _codepoint
+
+def setup_client(project_id=None, location="us-central1", cached=True):
     """
     Set up and return the Google Generative AI client.
     
+    By default clients are cached per project and location, so repeated calls reuse the same
+    instance and its pooled HTTP session for synchronous calls. The client's async transport is
+    bound to the event loop it is first used on, so code that runs each batch under its own
+    asyncio.run() should ask for an uncached client and close it afterwards (see close_async_client).
+    
     Args:
         project_id (str, optional): Google Cloud project ID. If None, will try to get from environment.
         location (str, optional): Google Cloud location. Defaults to "us-central1".
+        cached (bool, optional): Return the shared per-process client. Defaults to True.
         
     Returns:
         genai.Client: Configured client for the Generative AI API
@@ -30,43 +101,339 @@ def setup_client(project_id=None, location="us-central1"):
         if not project_id:
             raise ValueError("Project ID must be provided either as an argument or via GOOGLE_CLOUD_PROJECT environment variable")
     
+    if not cached:
+        return genai.Client(vertexai=True, project=project_id, location=location)
+    return _cached_client(project_id, location)
+
+@lru_cache(maxsize=8)
+def _cached_client(project_id, location):
+    """Build one client per (project_id, location) so credential discovery happens only once."""
     return genai.Client(vertexai=True, project=project_id, location=location)
 
-def generate_image(client, prompt, model="imagen-4.0-generate-preview-05-20", output_dir=None):
+async def close_async_client(client):
     """
-    Generate an image based on the provided prompt.
+    Close the client's async HTTP transport on the current event loop.
+    
+    Only use this on clients from setup_client(cached=False); the async side of a closed client
+    cannot be used again.
+    
+    Args:
+        client (genai.Client): The Google Generative AI client
+    """
+    aclose = getattr(client.aio, "aclose", None)
+    # Older google-genai releases have no aclose and leave the transport to garbage collection
+    if aclose is not None:
+        await aclose()
+
+def _validate_prompt(prompt):
+    """
+    Check a prompt locally so known-bad input never costs an API round-trip.
+    
+    Args:
+        prompt (str): The text prompt for image generation
+        
+    Returns:
+        str: The prompt stripped of surrounding whitespace and truncated to MAX_PROMPT_LENGTH
+    """
+    prompt = prompt.strip()
+    if not prompt:
+        raise ValueError("empty prompt")
+    if len(prompt) > MAX_PROMPT_LENGTH:
+        print(f"Warning: prompt truncated to {MAX_PROMPT_LENGTH} characters.")
+        prompt = prompt[:MAX_PROMPT_LENGTH]
+    return prompt
+
+def _validate_model(model):
+    """Warn about model names outside KNOWN_MODELS, which are most likely typos."""
+    if model not in KNOWN_MODELS:
+        print(f"Warning: unknown model '{model}'. Known models: {', '.join(sorted(KNOWN_MODELS))}")
+
+@lru_cache(maxsize=256)
+def _cache_key(model, prompt):
+    """Return a stable SHA-256 hex digest identifying a (model, prompt) pair."""
+    payload = json.dumps({"m": model, "p": prompt}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _cached_image(model, prompt, cache_ttl=None):
+    """
+    Look up a previously generated image in the on-disk cache.
+    
+    Args:
+        model (str): The model the image was generated with
+        prompt (str): The text prompt the image was generated from
+        cache_ttl (float, optional): Maximum age of a cache entry in seconds. If None, entries never expire.
+        
+    Returns:
+        Path: Path to the cached image, or None on a miss. Expired entries are deleted.
+    """
+    cache_path = CACHE_DIR / f"{_cache_key(model, prompt)}.png"
+    try:
+        age = time.time() - os.path.getmtime(cache_path)
+    except OSError:
+        return None
+    if cache_ttl is not None and age > cache_ttl:
+        try:
+            cache_path.unlink()
+        except OSError:
+            # Already removed by a concurrent lookup, or not removable; either way it is a miss
+            pass
+        return None
+    return cache_path
+
+def _write_cache_entry(image, model, prompt):
+    """
+    Write a freshly generated image into the on-disk cache.
+    
+    The image is saved to a private temp file and renamed into place, so concurrent writers of the
+    same key never leave a half-written entry behind.
+    
+    Args:
+        image: The image from a generate_images response
+        model (str): The model the image was generated with
+        prompt (str): The text prompt the image was generated from
+        
+    Returns:
+        Path: Path to the cache entry
+    """
+    cache_path = CACHE_DIR / f"{_cache_key(model, prompt)}.png"
+    CACHE_DIR.mkdir(exist_ok=True, parents=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        image.save(tmp_path)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return cache_path
+
+def _save_image(image, image_path, model, prompt, use_cache=True):
+    """
+    Save a generated image to its output path, going through the on-disk cache when enabled.
+    
+    The cache entry is written straight from the response and the output file is copied from it,
+    never the other way round, so the cache cannot pick up bytes another task wrote to the output path.
+    
+    Args:
+        image: The image from a generate_images response
+        image_path (Path): Path to save the image to
+        model (str): The model the image was generated with
+        prompt (str): The text prompt the image was generated from
+        use_cache (bool, optional): Store the image in the on-disk cache. Defaults to True.
+    """
+    if use_cache:
+        try:
+            cache_path = _write_cache_entry(image, model, prompt)
+        except OSError as e:
+            print(f"Warning: could not write image cache: {e}")
+        else:
+            shutil.copyfile(cache_path, image_path)
+            return
+    image.save(str(image_path))
+
+@lru_cache(maxsize=256)
+def _safe_filename(prompt_prefix):
+    """Return the image file stem for a prompt prefix, with non-alphanumeric characters replaced by "_"."""
+    return f"imagen4_{prompt_prefix.translate(_SAFE_FILENAME_TABLE)}"
+
+def _image_path(prompt, output_dir=None, index=None):
+    """
+    Build the output path for the image generated from a prompt.
+    
+    Args:
+        prompt (str): The text prompt for image generation
+        output_dir (str, optional): Directory to save the generated image. If None, uses a temp directory.
+        index (int, optional): Position of the prompt in a batch. Appended to the filename so prompts
+            sharing their first 30 characters, or repeated prompts, never write to the same file.
+        
+    Returns:
+        Path: Path the image should be saved to
+    """
+    if output_dir:
+        save_dir = Path(output_dir)
+        save_dir.mkdir(exist_ok=True, parents=True)
+    else:
+        save_dir = Path(tempfile.gettempdir())
+    
+    # Create a safe filename from the prompt
+    stem = _safe_filename(prompt[:30])
+    if index is not None:
+        stem = f"{stem}_{index}"
+    return save_dir / f"{stem}.png"
+
+def _retry_delay(error, attempt, max_retries):
+    """
+    Decide whether a failed API call should be retried.
+    
+    Args:
+        error (Exception): The error raised by the API call
+        attempt (int): Zero-based number of the attempt that failed
+        max_retries (int): Maximum number of attempts
+        
+    Returns:
+        float: Seconds to wait before the next attempt, or None if the error should be raised
+    """
+    if isinstance(error, errors.APIError):
+        retryable = error.code in RETRYABLE_STATUS_CODES
+    else:
+        retryable = isinstance(error, RETRYABLE_TRANSPORT_ERRORS)
+    if not retryable or attempt == max_retries - 1:
+        return None
+    return min(2 ** attempt, 60) + random.uniform(0, 1)
+
+def _prompt_label(prompt, index=None):
+    """Return a short description of a prompt for log lines: its batch index, or its first 40 characters."""
+    if index is not None:
+        return f"prompt #{index}"
+    return f"prompt '{prompt[:40]}...'" if len(prompt) > 40 else f"prompt '{prompt}'"
+
+class _Backoff:
+    """
+    Retry bookkeeping shared by the synchronous and asynchronous API calls.
+    
+    Callers loop on the API call and, on failure, sleep for next_delay(error) in whichever way suits
+    them; next_delay re-raises the error once it is not retryable or the attempts are exhausted.
+    """
+    
+    def __init__(self, label, max_retries=MAX_RETRIES):
+        if max_retries < 1:
+            raise ValueError("max_retries must be at least 1")
+        self.label = label
+        self.max_retries = max_retries
+        self.attempt = 0
+    
+    def next_delay(self, error):
+        delay = _retry_delay(error, self.attempt, self.max_retries)
+        if delay is None:
+            raise error
+        self.attempt += 1
+        print(f"Transient error ({error}) for {self.label}, retrying in {delay:.1f}s...")
+        return delay
+
+def _generate_with_retry_sync(client, prompt, model, max_retries=MAX_RETRIES):
+    """
+    Call the Imagen API with the synchronous client, retrying transient errors with exponential backoff and jitter.
+    
+    Args:
+        client (genai.Client): The Google Generative AI client
+        prompt (str): The text prompt for image generation
+        model (str): The model to use
+        max_retries (int, optional): Maximum number of attempts. Defaults to MAX_RETRIES.
+        
+    Returns:
+        The generate_images response
+    """
+    backoff = _Backoff(_prompt_label(prompt), max_retries)
+    while True:
+        try:
+            return client.models.generate_images(
+                model=model,
+                prompt=prompt,
+            )
+        except Exception as e:
+            time.sleep(backoff.next_delay(e))
+
+async def _generate_with_retry(client, prompt, model, max_retries=MAX_RETRIES, index=None):
+    """
+    Call the Imagen API, retrying transient errors with exponential backoff and jitter.
+    
+    Args:
+        client (genai.Client): The Google Generative AI client
+        prompt (str): The text prompt for image generation
+        model (str): The model to use
+        max_retries (int, optional): Maximum number of attempts. Defaults to MAX_RETRIES.
+        index (int, optional): Position of the prompt in a batch, used to label retry messages.
+        
+    Returns:
+        The generate_images response
+    """
+    backoff = _Backoff(_prompt_label(prompt, index), max_retries)
+    while True:
+        try:
+            return await client.aio.models.generate_images(
+                model=model,
+                prompt=prompt,
+            )
+        except Exception as e:
+            # asyncio.sleep lets the other in-flight requests of a batch keep running
+            await asyncio.sleep(backoff.next_delay(e))
+
+async def generate_image_async(client, prompt, model="imagen-4.0-generate-preview-05-20", output_dir=None,
+                               use_cache=True, cache_ttl=None, index=None):
+    """
+    Generate an image based on the provided prompt without blocking the event loop.
     
     Args:
         client (genai.Client): The Google Generative AI client
         prompt (str): The text prompt for image generation
         model (str, optional): The model to use. Defaults to "imagen-4.0-generate-preview-05-20".
         output_dir (str, optional): Directory to save the generated image. If None, uses a temp directory.
+        use_cache (bool, optional): Reuse a previously generated image for the same model and prompt. Defaults to True.
+        cache_ttl (float, optional): Maximum age of a cached image in seconds. If None, cached images never expire.
+        index (int, optional): Position of the prompt in a batch, used to keep output filenames unique.
         
     Returns:
         str: Path to the saved image
     """
-    print(f"Generating image with prompt: {prompt}")
-    
     try:
-        response = client.models.generate_images(
-            model=model,
-            prompt=prompt,
-        )
+        prompt = _validate_prompt(prompt)
+        image_path = _image_path(prompt, output_dir, index)
         
-        # Save the image
-        if output_dir:
-            save_dir = Path(output_dir)
-            save_dir.mkdir(exist_ok=True, parents=True)
-        else:
-            save_dir = Path(tempfile.gettempdir())
+        cache_path = _cached_image(model, prompt, cache_ttl) if use_cache else None
+        if cache_path:
+            await asyncio.to_thread(shutil.copyfile, cache_path, image_path)
+            print(f"Using cached image for prompt: {prompt}")
+            print(f"Image saved to: {image_path}")
+            return str(image_path)
+        
+        print(f"Generating image with prompt: {prompt}")
+        response = await _generate_with_retry(client, prompt, model, index=index)
+        
+        # Save the image to disk off the event loop so other requests keep being dispatched
+        await asyncio.to_thread(_save_image, response.generated_images[0].image, image_path, model, prompt, use_cache)
+        # Drop the image bytes now so a batch holds at most max_concurrent images in memory
+        del response
+        
+        print(f"Image saved to: {image_path}")
+        return str(image_path)
+    
+    except Exception as e:
+        print(f"Error generating image: {e}")
+        return None
+
+def generate_image(client, prompt, model="imagen-4.0-generate-preview-05-20", output_dir=None,
+                   use_cache=True, cache_ttl=None):
+    """
+    Generate an image based on the provided prompt.
+    
+    Uses the synchronous client, so it is safe to call from code that already runs an event loop,
+    such as a Jupyter notebook.
+    
+    Args:
+        client (genai.Client): The Google Generative AI client
+        prompt (str): The text prompt for image generation
+        model (str, optional): The model to use. Defaults to "imagen-4.0-generate-preview-05-20".
+        output_dir (str, optional): Directory to save the generated image. If None, uses a temp directory.
+        use_cache (bool, optional): Reuse a previously generated image for the same model and prompt. Defaults to True.
+        cache_ttl (float, optional): Maximum age of a cached image in seconds. If None, cached images never expire.
+        
+    Returns:
+        str: Path to the saved image
+    """
+    try:
+        prompt = _validate_prompt(prompt)
+        image_path = _image_path(prompt, output_dir)
         
-        # Create a safe filename from the prompt
-        safe_prompt = "".join(c if c.isalnum() else "_" for c in prompt[:30])
-        image_path = save_dir / f"imagen4_{safe_prompt}.png"
+        cache_path = _cached_image(model, prompt, cache_ttl) if use_cache else None
+        if cache_path:
+            shutil.copyfile(cache_path, image_path)
+            print(f"Using cached image for prompt: {prompt}")
+            print(f"Image saved to: {image_path}")
+            return str(image_path)
         
-        # Save the image to disk
-        with open(image_path, "wb") as f:
-            f.write(response.generated_images[0].image.data)
+        print(f"Generating image with prompt: {prompt}")
+        response = _generate_with_retry_sync(client, prompt, model)
+        _save_image(response.generated_images[0].image, image_path, model, prompt, use_cache)
         
         print(f"Image saved to: {image_path}")
         return str(image_path)
@@ -75,19 +442,127 @@ def generate_image(client, prompt, model="imagen-4.0-generate-preview-05-20", ou
         print(f"Error generating image: {e}")
         return None
 
+async def generate_batch(client, prompts, model="imagen-4.0-generate-preview-05-20", output_dir=None, max_concurrent=5,
+                         use_cache=True, cache_ttl=None):
+    """
+    Generate images for several prompts concurrently.
+    
+    At most max_concurrent requests are in flight at once, so the batch takes roughly
+    the latency of the slowest request per window instead of the sum of all of them.
+    
+    The client's async transport stays bound to the event loop it first ran on, so a client must
+    only be used with one loop. Callers that start a new loop per batch (for example, separate
+    asyncio.run() calls) should pass a client from setup_client(cached=False) each time and
+    close it with close_async_client when the batch is done, as run() does.
+    
+    Args:
+        client (genai.Client): The Google Generative AI client
+        prompts (list[str]): The text prompts for image generation
+        model (str, optional): The model to use. Defaults to "imagen-4.0-generate-preview-05-20".
+        output_dir (str, optional): Directory to save the generated images. If None, uses a temp directory.
+        max_concurrent (int, optional): Maximum number of concurrent API calls, at least 1. Defaults to 5.
+        use_cache (bool, optional): Reuse previously generated images for the same model and prompt. Defaults to True.
+        cache_ttl (float, optional): Maximum age of a cached image in seconds. If None, cached images never expire.
+        
+    Returns:
+        list: Path to each saved image, or None where generation failed, in prompt order
+    """
+    if max_concurrent < 1:
+        raise ValueError("max_concurrent must be at least 1")
+    semaphore = asyncio.Semaphore(max_concurrent)
+    
+    async def _gen_one(index, prompt):
+        async with semaphore:
+            return await generate_image_async(client, prompt, model=model, output_dir=output_dir,
+                                              use_cache=use_cache, cache_ttl=cache_ttl, index=index)
+    
+    # Single prompts keep the plain prompt-based filename; batch entries get their index appended
+    indexed = len(prompts) > 1
+    # generate_image_async reports its own errors and returns None, so one failed prompt
+    # never cancels the rest of the batch
+    return await asyncio.gather(*[_gen_one(i if indexed else None, p) for i, p in enumerate(prompts, 1)])
+
+def read_prompts_file(prompts_file):
+    """
+    Read prompts from a text file, one prompt per line.
+    
+    Args:
+        prompts_file (str): Path to the prompts file
+        
+    Returns:
+        list[str]: Non-empty prompts in file order
+    """
+    with open(prompts_file, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
 def display_image(image_path):
     """
     Display the generated image using the default image viewer.
     
+    Nothing is opened when stdout is not a terminal or IMAGEN4_NO_DISPLAY is set.
+    
     Args:
         image_path (str): Path to the image file
     """
+    if not sys.stdout.isatty() or os.environ.get("IMAGEN4_NO_DISPLAY"):
+        return
+    
     if image_path and os.path.exists(image_path):
         print(f"Opening image: {image_path}")
-        webbrowser.open(f"file://{os.path.abspath(image_path)}")
+        try:
+            # Hand the file to the platform's native viewer rather than starting a browser
+            system = platform.system()
+            if system == "Windows":
+                os.startfile(image_path)
+            else:
+                opener = "open" if system == "Darwin" else "xdg-open"
+                subprocess.Popen([opener, image_path], stdin=subprocess.DEVNULL,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            webbrowser.open(Path(image_path).resolve().as_uri())
     else:
         print("No image to display.")
 
+async def run(args):
+    """
+    Generate and display images for the prompts selected by the command-line arguments.
+    
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+    """
+    _validate_model(args.model)
+    
+    # Set up a client owned by this event loop, and close its async transport before the loop ends
+    client = setup_client(project_id=args.project, location=args.location, cached=False)
+    try:
+        # Get the prompts; a single prompt is just a batch of one
+        if args.prompts_file:
+            prompts = read_prompts_file(args.prompts_file)
+        elif args.prompt:
+            prompts = [args.prompt]
+        else:
+            prompts = [input("Enter your image prompt: ")]
+        
+        # Generate and display the images
+        image_paths = await generate_batch(
+            client,
+            prompts,
+            model=args.model,
+            output_dir=args.output_dir,
+            max_concurrent=args.max_concurrent,
+            use_cache=not args.no_cache,
+            cache_ttl=args.cache_ttl,
+        )
+    finally:
+        await close_async_client(client)
+    
+    # Batches are usually run unattended, so only single prompts open a viewer
+    if args.no_display or args.prompts_file:
+        return
+    for image_path in image_paths:
+        if image_path:
+            display_image(image_path)
+
 def main():
     parser = argparse.ArgumentParser(description="Generate images using Google's Imagen 4 model")
     parser.add_argument("--project", help="Google Cloud project ID")
@@ -95,23 +570,18 @@ def main():
     parser.add_argument("--output-dir", help="Directory to save generated images")
     parser.add_argument("--model", default="imagen-4.0-generate-preview-05-20", help="Model name to use")
     parser.add_argument("--prompt", help="Text prompt for image generation (if not provided, will prompt interactively)")
+    parser.add_argument("--prompts-file", help="Text file with one prompt per line to generate as a batch")
+    parser.add_argument("--max-concurrent", type=int, default=5, help="Maximum number of concurrent API calls in batch mode")
+    parser.add_argument("--no-display", action="store_true", help="Do not open generated images (always the case for --prompts-file)")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API instead of reusing cached images")
+    parser.add_argument("--cache-ttl", type=float, help="Maximum age in seconds of a cached image (default: no expiry)")
     
     args = parser.parse_args()
+    if args.max_concurrent < 1:
+        parser.error("--max-concurrent must be at least 1")
     
     try:
-        # Set up the client
-        client = setup_client(project_id=args.project, location=args.location)
-        
-        # Get the prompt
-        if args.prompt:
-            prompt = args.prompt
-        else:
-            prompt = input("Enter your image prompt: ")
-        
-        # Generate and display the image
-        image_path = generate_image(client, prompt, model=args.model, output_dir=args.output_dir)
-        if image_path:
-            display_image(image_path)
+        asyncio.run(run(args))
     
     except KeyboardInterrupt:
         print("\nOperation cancelled by user.")
@@ -122,4 +592,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -10,7 +10,7 @@ echo.
 echo Checking Python installation...
 where python >nul 2>&1
 if %ERRORLEVEL% neq 0 (
-    echo Python not found. Please install Python 3.7 or higher.
+    echo Python not found. Please install Python 3.9 or higher.
     exit /b 1
 )
 
@@ -22,12 +22,12 @@ for /f "tokens=1,2 delims=." %%a in ("%PYTHON_VERSION%") do (
 )
 
 if %PYTHON_MAJOR% LSS 3 (
-    echo Python 3.7 or higher is required. Found: %PYTHON_VERSION%
+    echo Python 3.9 or higher is required. Found: %PYTHON_VERSION%
     exit /b 1
 ) else (
     if %PYTHON_MAJOR% EQU 3 (
-        if %PYTHON_MINOR% LSS 7 (
-            echo Python 3.7 or higher is required. Found: %PYTHON_VERSION%
+        if %PYTHON_MINOR% LSS 9 (
+            echo Python 3.9 or higher is required. Found: %PYTHON_VERSION%
             exit /b 1
         )
     )
@@ -12,27 +12,35 @@ It guides users through:
 
 import os
 import sys
-import subprocess
+import asyncio
+import io
 import platform
-import json
 import tempfile
 from pathlib import Path
 
+# orjson is optional (`pip install orjson`); it only speeds up parsing long gcloud project lists
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
 def print_step(step_num, total_steps, message):
     """Print a formatted step message."""
-    print(f"\n[{step_num}/{total_steps}] {message}")
-    print("=" * 80)
+    sys.stdout.write(f"\n[{step_num}/{total_steps}] {message}\n{'=' * 80}\n")
 
-def run_command(command, shell=False):
-    """Run a shell command and return the result."""
+async def run_command(command, shell=False):
+    """Run a shell command asynchronously and return the result."""
     try:
         if shell:
-            result = subprocess.run(command, shell=True, check=True, text=True, capture_output=True)
+            proc = await asyncio.create_subprocess_shell(
+                command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
         else:
-            result = subprocess.run(command, check=True, text=True, capture_output=True)
-        return True, result.stdout
-    except subprocess.CalledProcessError as e:
-        return False, e.stderr
+            proc = await asyncio.create_subprocess_exec(
+                *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            return False, stderr.decode(errors="replace")
+        return True, stdout.decode(errors="replace")
     except Exception as e:
         return False, str(e)
 
@@ -41,8 +49,8 @@ def check_python_version():
     print_step(1, 6, "Checking Python version")
     
     version = sys.version_info
-    if version.major < 3 or (version.major == 3 and version.minor < 7):
-        print("❌ Python 3.7 or higher is required.")
+    if version.major < 3 or (version.major == 3 and version.minor < 9):
+        print("❌ Python 3.9 or higher is required.")
         print(f"   Current version: {sys.version}")
         print("   Please upgrade your Python installation.")
         return False
@@ -50,33 +58,43 @@ def check_python_version():
     print(f"✅ Python version {sys.version.split()[0]} is compatible.")
     return True
 
-def install_dependencies():
-    """Install required Python packages."""
-    print_step(2, 6, "Installing dependencies")
+async def install_dependencies(out=None):
+    """
+    Install required Python packages.
+    
+    Result messages go to out (default: stdout) so main() can print them under this step's header
+    after it has run concurrently with the gcloud check.
+    """
     
     requirements_file = Path("requirements.txt")
     if not requirements_file.exists():
-        print("❌ requirements.txt not found in the current directory.")
+        print("❌ requirements.txt not found in the current directory.", file=out)
         return False
     
-    success, output = run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+    # --prefer-binary keeps pip on prebuilt wheels instead of building an sdist just because it is newer
+    success, output = await run_command([sys.executable, "-m", "pip", "install", "--prefer-binary",
+                                         "--disable-pip-version-check", "-r", "requirements.txt"])
     if not success:
-        print(f"❌ Failed to install dependencies: {output}")
+        print(f"❌ Failed to install dependencies: {output}", file=out)
         return False
     
-    print("✅ Dependencies installed successfully.")
+    print("✅ Dependencies installed successfully.", file=out)
     return True
 
-def check_gcloud_installation():
-    """Check if gcloud CLI is installed."""
-    print_step(3, 6, "Checking Google Cloud SDK installation")
+async def check_gcloud_installation(out=None):
+    """
+    Check if gcloud CLI is installed.
+    
+    Result messages go to out (default: stdout) so main() can print them under this step's header
+    after it has run concurrently with the dependency install.
+    """
     
     gcloud_cmd = "gcloud"
-    success, output = run_command([gcloud_cmd, "--version"])
+    success, output = await run_command([gcloud_cmd, "--version"])
     
     if not success:
         # Try with the known full path if the simple command fails
-        print("   Attempting to use known SDK path...")
+        print("   Attempting to use known SDK path...", file=out)
         # For Windows, gcloud is often a .cmd file.
         # The path needs to be specific to your user and OS.
         # $env:LOCALAPPDATA usually C:\Users\<username>\AppData\Local
@@ -108,21 +126,21 @@ def check_gcloud_installation():
             pass # No specific fallback path for non-Windows in this quick fix
 
         if platform.system() == "Windows" and 'gcloud_cmd_path' in locals() and gcloud_cmd_path.exists():
-            print(f"   Trying full path: {gcloud_cmd_path}")
+            print(f"   Trying full path: {gcloud_cmd_path}", file=out)
             gcloud_cmd = str(gcloud_cmd_path)
-            success, output = run_command([gcloud_cmd, "--version"])
+            success, output = await run_command([gcloud_cmd, "--version"])
         
     if not success:
-        print("❌ Google Cloud SDK (gcloud) is not installed or not in PATH.")
-        print("   Even after attempting a known common path, gcloud was not found or failed.")
-        print("\nPlease install the Google Cloud SDK:")
-        print("- Visit: https://cloud.google.com/sdk/docs/install")
-        print("- Follow the installation instructions for your operating system.")
-        print("- After installation, run 'gcloud init' to initialize the SDK.")
-        print("- Then run this setup script again.")
-        return False
+        print("❌ Google Cloud SDK (gcloud) is not installed or not in PATH.", file=out)
+        print("   Even after attempting a known common path, gcloud was not found or failed.", file=out)
+        print("\nPlease install the Google Cloud SDK:", file=out)
+        print("- Visit: https://cloud.google.com/sdk/docs/install", file=out)
+        print("- Follow the installation instructions for your operating system.", file=out)
+        print("- After installation, run 'gcloud init' to initialize the SDK.", file=out)
+        print("- Then run this setup script again.", file=out)
+        return False, None
     
-    print("✅ Google Cloud SDK is installed.")
+    print("✅ Google Cloud SDK is installed.", file=out)
     # Store the successfully used command for other functions to use
     # This is a bit of a hack; a better way would be to pass gcloud_cmd around
     # or set it as a global/class variable if this script were a class.
@@ -147,7 +165,7 @@ def check_gcloud_installation():
     # Alternative: If the full path works, we can try to add its directory to the PATH for this script's session.
     if success and gcloud_cmd != "gcloud": # Means full path was used
         gcloud_dir = str(Path(gcloud_cmd).parent)
-        print(f"   Adding {gcloud_dir} to PATH for this session.")
+        print(f"   Adding {gcloud_dir} to PATH for this session.", file=out)
         os.environ["PATH"] = gcloud_dir + os.pathsep + os.environ["PATH"]
         # Now, subsequent calls to "gcloud" in this script *should* find it.
     
@@ -156,7 +174,7 @@ def check_gcloud_installation():
     else:
         return False, None
 
-def setup_gcloud_auth(gcloud_executable):
+async def setup_gcloud_auth(gcloud_executable):
     """Set up Google Cloud authentication."""
     print_step(4, 6, "Setting up Google Cloud authentication")
     
@@ -165,7 +183,7 @@ def setup_gcloud_auth(gcloud_executable):
     
     input("Press Enter to continue...")
     
-    success, output = run_command([gcloud_executable, "auth", "application-default", "login"])
+    success, output = await run_command([gcloud_executable, "auth", "application-default", "login"])
     if not success:
         print(f"❌ Failed to set up authentication: {output}")
         return False
@@ -173,7 +191,7 @@ def setup_gcloud_auth(gcloud_executable):
     print("✅ Google Cloud authentication set up successfully.")
     return True
 
-def configure_project(gcloud_executable):
+async def configure_project(gcloud_executable):
     """Configure the Google Cloud project ID."""
     print_step(5, 6, "Configuring Google Cloud project")
     
@@ -186,27 +204,27 @@ def configure_project(gcloud_executable):
             return True, project_id
     
     # List available projects
-    success, output = run_command([gcloud_executable, "projects", "list", "--format=json"])
+    success, output = await run_command([gcloud_executable, "projects", "list", "--format=json"])
     if not success:
         print(f"❌ Failed to list projects: {output}")
         project_id = input("Enter your Google Cloud project ID manually: ")
     else:
         try:
-            projects = json.loads(output)
+            projects = _json.loads(output)
             if not projects:
                 print("No projects found in your Google Cloud account.")
                 project_id = input("Enter your Google Cloud project ID: ")
             else:
-                print("\nAvailable projects:")
-                for i, project in enumerate(projects, 1):
-                    print(f"{i}. {project['projectId']} - {project.get('name', 'No name')}")
+                # Build the whole menu first so it goes out in a single write
+                lines = [f"{i}. {p['projectId']} - {p.get('name', 'No name')}" for i, p in enumerate(projects, 1)]
+                sys.stdout.write("\nAvailable projects:\n" + "\n".join(lines) + "\n")
                 
                 choice = input("\nSelect a project number or enter a project ID manually: ")
                 if choice.isdigit() and 1 <= int(choice) <= len(projects):
                     project_id = projects[int(choice) - 1]['projectId']
                 else:
                     project_id = choice
-        except json.JSONDecodeError:
+        except _json.JSONDecodeError:
             print("❌ Failed to parse project list.")
             project_id = input("Enter your Google Cloud project ID manually: ")
     
@@ -231,11 +249,10 @@ def test_imagen_api(project_id):
     print_step(6, 6, "Testing connection to Imagen API")
     
     try:
-        from google import genai
-        from google.cloud import aiplatform
+        from imagen4_cli import setup_client
         
         print("Initializing client...")
-        client = genai.Client(vertexai=True, project=project_id, location="us-central1")
+        client = setup_client(project_id=project_id, location="us-central1")
         
         print("Testing API access with a simple prompt...")
         # Use a very simple prompt for testing
@@ -250,8 +267,7 @@ def test_imagen_api(project_id):
         test_dir = Path(tempfile.gettempdir())
         test_image_path = test_dir / "imagen4_test.png"
         
-        with open(test_image_path, "wb") as f:
-            f.write(response.generated_images[0].image.data)
+        response.generated_images[0].image.save(str(test_image_path))
         
         print(f"✅ Successfully connected to Imagen API!")
         print(f"✅ Test image saved to: {test_image_path}")
@@ -260,7 +276,7 @@ def test_imagen_api(project_id):
         view_image = input("Do you want to view the test image? (y/N): ").lower()
         if view_image == 'y':
             import webbrowser
-            webbrowser.open(f"file://{test_image_path.absolute()}")
+            webbrowser.open(test_image_path.resolve().as_uri())
         
         return True
     except ImportError:
@@ -277,7 +293,7 @@ def test_imagen_api(project_id):
         print("- Follow the instructions to request access for your project")
         return False
 
-def main():
+async def main():
     """Main function to run the setup process."""
     print("\n" + "=" * 80)
     print("Welcome to the Imagen4 CLI Setup".center(80))
@@ -287,21 +303,27 @@ def main():
     if not check_python_version():
         return False
     
-    # Install dependencies
-    if not install_dependencies():
-        return False
-    
-    # Check gcloud installation
-    gcloud_ok, gcloud_cmd_to_use = check_gcloud_installation()
-    if not gcloud_ok:
+    # Install dependencies and check gcloud installation; they are independent, so run them together
+    # and print each step's buffered results under its own header once both have finished
+    print("\nInstalling dependencies and checking Google Cloud SDK installation (this may take a few minutes)...")
+    deps_out, gcloud_out = io.StringIO(), io.StringIO()
+    deps_ok, (gcloud_ok, gcloud_cmd_to_use) = await asyncio.gather(
+        install_dependencies(deps_out),
+        check_gcloud_installation(gcloud_out),
+    )
+    print_step(2, 6, "Installing dependencies")
+    sys.stdout.write(deps_out.getvalue())
+    print_step(3, 6, "Checking Google Cloud SDK installation")
+    sys.stdout.write(gcloud_out.getvalue())
+    if not deps_ok or not gcloud_ok:
         return False
     
     # Set up authentication
-    if not setup_gcloud_auth(gcloud_cmd_to_use):
+    if not await setup_gcloud_auth(gcloud_cmd_to_use):
         return False
     
     # Configure project
-    success, project_id = configure_project(gcloud_cmd_to_use)
+    success, project_id = await configure_project(gcloud_cmd_to_use)
     if not success:
         return False
     
@@ -322,7 +344,7 @@ def main():
 
 if __name__ == "__main__":
     try:
-        success = main()
+        success = asyncio.run(main())
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\n\nSetup cancelled by user.")
@@ -18,7 +18,7 @@ if command -v python3 &>/dev/null; then
 elif command -v python &>/dev/null; then
     PYTHON_CMD="python"
 else
-    echo -e "${RED}Python not found. Please install Python 3.7 or higher.${NC}"
+    echo -e "${RED}Python not found. Please install Python 3.9 or higher.${NC}"
     exit 1
 fi
 
@@ -27,8 +27,8 @@ PYTHON_VERSION=$($PYTHON_CMD -c "import sys; print(f'{sys.version_info.major}.{s
 PYTHON_VERSION_MAJOR=$(echo $PYTHON_VERSION | cut -d. -f1)
 PYTHON_VERSION_MINOR=$(echo $PYTHON_VERSION | cut -d. -f2)
 
-if [ "$PYTHON_VERSION_MAJOR" -lt 3 ] || ([ "$PYTHON_VERSION_MAJOR" -eq 3 ] && [ "$PYTHON_VERSION_MINOR" -lt 7 ]); then
-    echo -e "${RED}Python 3.7 or higher is required. Found: $PYTHON_VERSION${NC}"
+if [ "$PYTHON_VERSION_MAJOR" -lt 3 ] || ([ "$PYTHON_VERSION_MAJOR" -eq 3 ] && [ "$PYTHON_VERSION_MINOR" -lt 9 ]); then
+    echo -e "${RED}Python 3.9 or higher is required. Found: $PYTHON_VERSION${NC}"
     exit 1
 fi
 